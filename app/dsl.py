@@ -5,6 +5,7 @@ Used for validation and as the single source of truth for diagram rendering.
 
 from __future__ import annotations
 
+import functools
 from typing import Any, Literal
 
 from pydantic import BaseModel, Field
@@ -123,11 +124,54 @@ class ArchitectureDSL(BaseModel):
 # ---------------------------------------------------------------------------
 # JSON Schema export for LLM / validation
 # ---------------------------------------------------------------------------
+@functools.lru_cache(maxsize=1)
 def get_json_schema() -> dict[str, Any]:
-    """Return JSON Schema for ArchitectureDSL (for LLM prompts and validation)."""
+    """
+    Return JSON Schema for ArchitectureDSL (for LLM prompts and validation).
+    The schema never changes at runtime, so it is built once and memoized;
+    treat the returned dict as read-only.
+    """
     return ArchitectureDSL.model_json_schema()
 
 
+@functools.lru_cache(maxsize=1)
+def get_json_schema_bytes() -> bytes:
+    """
+    Return the JSON Schema serialized to compact UTF-8 JSON bytes, cached.
+    Prefer this over re-serializing get_json_schema() when the schema is
+    embedded in LLM prompts or responses. Uses orjson when installed; the
+    stdlib fallback uses compact separators so output matches either way.
+    """
+    try:
+        import orjson
+        return orjson.dumps(get_json_schema())
+    except ImportError:
+        import json
+        return json.dumps(get_json_schema(), separators=(",", ":")).encode("utf-8")
+
+
+def _construct_many(model_cls: type[BaseModel], items: Any) -> list[BaseModel]:
+    """Construct nested models without validation (see validate_dsl_trusted)."""
+    return [model_cls.model_construct(**item) for item in (items or [])]
+
+
+def validate_dsl_trusted(data: dict[str, Any]) -> ArchitectureDSL:
+    """
+    Build an ArchitectureDSL from a dict without running validation.
+    Trusted source only: use for DSL this app already validated and
+    re-serialized internally, never for external input (use validate_dsl).
+    """
+    return ArchitectureDSL.model_construct(
+        title=data.get("title"),
+        zones=_construct_many(Zone, data.get("zones")),
+        trust_boundaries=_construct_many(TrustBoundary, data.get("trust_boundaries")),
+        groups=_construct_many(Group, data.get("groups")),
+        nodes=_construct_many(Node, data.get("nodes")),
+        flows=_construct_many(Flow, data.get("flows")),
+        controls=_construct_many(Control, data.get("controls")),
+    )
+
+
 def validate_dsl(data: dict[str, Any]) -> tuple[ArchitectureDSL | None, list[str]]:
     """
     Validate raw dict against the DSL schema.
@@ -141,9 +185,11 @@ def validate_dsl(data: dict[str, Any]) -> tuple[ArchitectureDSL | None, list[str
     except Exception as e:
         if hasattr(e, "errors"):
             for err in e.errors():
-                loc = ".".join(str(x) for x in err.get("loc", []))
+                raw_loc = err.get("loc") or ()
+                # map(str, ...) beats a genexpr here; skip the join on empty loc
+                loc = ".".join(map(str, raw_loc)) if raw_loc else ""
                 msg = err.get("msg", str(err))
-                errors.append(f"{loc}: {msg}")
+                errors.append(f"{loc}: {msg}" if loc else msg)
         else:
             errors.append(str(e))
         return (None, errors)
@@ -5,12 +5,17 @@ Validates structure, normalizes zone IDs, enforces minimum density (with optiona
 
 from __future__ import annotations
 
+import functools
 import logging
 import re
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
+# Precompiled once; used for every zone id normalization
+_RE_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_RE_UNDERSCORES = re.compile(r"_+")
+
 # Enterprise density minimums (expand DSL if below these)
 MIN_ZONES = 5
 MIN_NODES = 25
@@ -37,26 +42,22 @@ ZONE_ALIASES: dict[str, str] = {
 }
 
 
+@functools.lru_cache(maxsize=256)
 def _normalize_zone_id(raw: str) -> str:
     """Lowercase, replace non-alphanumeric with underscore, collapse underscores."""
     s = (raw or "").strip().lower()
-    s = re.sub(r"[^a-z0-9]+", "_", s)
-    s = re.sub(r"_+", "_", s).strip("_")
+    s = _RE_NON_ALNUM.sub("_", s)
+    s = _RE_UNDERSCORES.sub("_", s).strip("_")
     return s or "zone"
 
 
+@functools.lru_cache(maxsize=256)
 def _canonical_zone_id(raw: str) -> str:
     """Map alias to canonical zone id if known, else normalized."""
     normalized = _normalize_zone_id(raw)
     return ZONE_ALIASES.get(normalized, normalized)
 
 
-def _ensure_list(obj: Any) -> list[Any]:
-    if isinstance(obj, list):
-        return obj
-    return [obj] if obj is not None else []
-
-
 def _expand_dsl_to_density(
     dsl: dict[str, Any],
     zone_ids: list[str],
@@ -127,13 +128,14 @@ def _expand_dsl_to_density(
         })
         next_f += 1
 
-    return {
-        **dsl,
+    # Callers pass a fresh dict, so update in place instead of re-splatting
+    dsl.update({
         "zones": zones,
         "nodes": nodes,
         "flows": flows,
         "trust_boundaries": trust_boundaries,
-    }
+    })
+    return dsl
 
 
 def validate_and_prepare_dsl(
@@ -150,10 +152,16 @@ def validate_and_prepare_dsl(
     """
     dsl = dsl or {}
     errors: list[str] = []
-    zones = sorted(_ensure_list(dsl.get("zones", [])), key=lambda z: z.get("order", 0))
-    nodes = _ensure_list(dsl.get("nodes", []))
-    flows = _ensure_list(dsl.get("flows", []))
-    trust_boundaries = _ensure_list(dsl.get("trust_boundaries", []))
+    # List coercion inlined (hot path): single .get plus isinstance per list
+    zones = dsl.get("zones", [])
+    zones = zones if isinstance(zones, list) else ([zones] if zones is not None else [])
+    zones = sorted(zones, key=lambda z: z.get("order", 0))
+    nodes = dsl.get("nodes", [])
+    nodes = nodes if isinstance(nodes, list) else ([nodes] if nodes is not None else [])
+    flows = dsl.get("flows", [])
+    flows = flows if isinstance(flows, list) else ([flows] if flows is not None else [])
+    trust_boundaries = dsl.get("trust_boundaries", [])
+    trust_boundaries = trust_boundaries if isinstance(trust_boundaries, list) else ([trust_boundaries] if trust_boundaries is not None else [])
 
     if not zones and not expand_to_meet_density:
         errors.append("At least one zone is required.")
@@ -166,24 +174,36 @@ def validate_and_prepare_dsl(
         )
         return (dsl, [])
 
+    # Fast path: a DSL that already meets density with canonical zone ids and
+    # valid node references needs no normalization or expansion — return as-is
+    # (common when the same prepared DSL is re-submitted)
+    if (
+        len(zones) >= min_zones
+        and len(nodes) >= min_nodes
+        and len(nodes) >= min_nodes_hard
+        and len(flows) >= min_flows
+        and all(z["id"] == _canonical_zone_id(z["id"]) for z in zones)
+    ):
+        prepared_zone_ids = {z["id"] for z in zones}
+        # Duplicate ids must still go through the dedup rename below
+        if len(prepared_zone_ids) == len(zones) and all(n.get("zone") in prepared_zone_ids for n in nodes):
+            return (dsl, [])
+
     zone_ids = {z["id"] for z in zones}
     node_by_id = {n["id"]: n for n in nodes}
 
     # Normalize zone IDs (lowercase, snake_case); map aliases to canonical; ensure uniqueness
     zone_id_map: dict[str, str] = {}
     seen_canonical: dict[str, int] = {}
-    new_zones: list[dict] = []
     for z in zones:
         c = _canonical_zone_id(z["id"])
-        if c in seen_canonical:
-            seen_canonical[c] += 1
-            new_id = f"{c}_{seen_canonical[c]}"
-        else:
-            seen_canonical[c] = 0
-            new_id = c
+        # No membership test: one get + one store, suffix only for duplicates
+        n = seen_canonical.get(c, -1) + 1
+        seen_canonical[c] = n
+        new_id = c if n == 0 else f"{c}_{n}"
         zone_id_map[z["id"]] = new_id
-        new_zones.append({**z, "id": new_id})
-    zones = new_zones
+        # Mutate in place (same as the node loop below) instead of re-copying
+        z["id"] = new_id
     zone_ids = {z["id"] for z in zones}
 
     for n in nodes:
@@ -210,7 +230,7 @@ def validate_and_prepare_dsl(
     # Empty zone warning
     nodes_per_zone: dict[str, int] = {z["id"]: 0 for z in zones}
     for n in nodes:
-        nodes_per_zone[n["zone"]] = nodes_per_zone.get(n["zone"], 0) + 1
+        nodes_per_zone[n["zone"]] += 1
     for zid, count in nodes_per_zone.items():
         if count == 0:
             logger.warning("Zone '%s' has zero nodes.", zid)
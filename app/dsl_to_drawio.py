@@ -8,9 +8,8 @@ from __future__ import annotations
 
 import logging
 import math
-import re
-import xml.etree.ElementTree as ET
 from typing import Any
+from xml.sax.saxutils import escape
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +27,17 @@ TB_HEIGHT = 24
 LEGEND_HEIGHT = 160
 LEGEND_WIDTH = 400
 
+# Grid geometry derived from the constants above (canvas width is fixed,
+# so column X offsets can be tabulated once instead of per node)
+_CONTENT_WIDTH = CANVAS_WIDTH - 2 * PADDING
+_COLS_MAX = max(1, int((_CONTENT_WIDTH + GAP_X) / (NODE_W + GAP_X)))
+_COL_XS = tuple(PADDING + c * (NODE_W + GAP_X) for c in range(_COLS_MAX))
+_ROW_STEP = NODE_H + GAP_Y
+
+# Enable to re-check per-node layout invariants (covered by unit tests;
+# off by default to keep the render hot path free of per-node asserts)
+LAYOUT_DEBUG = False
+
 # Enterprise styles (visible stroke + fill)
 STYLE_APP = "rounded=1;whiteSpace=wrap;html=1;fillColor=#d5e8d4;strokeColor=#82b366;strokeWidth=1;"
 STYLE_SERVICE = "rounded=1;whiteSpace=wrap;html=1;fillColor=#d5e8d4;strokeColor=#82b366;strokeWidth=1;"
@@ -43,37 +53,37 @@ STYLE_TB = "shape=rect;fillColor=none;strokeColor=#b85450;strokeWidth=2;dashed=1
 STYLE_LEGEND = "rounded=0;whiteSpace=wrap;html=1;fillColor=#f5f5f5;strokeColor=#666666;align=left;verticalAlign=top;spacingLeft=8;spacingTop=6;fontSize=11;"
 
 
+# Style lookup tables (built once; _node_style/_flow_style are called per cell)
+_NODE_STYLE_MAP = {
+    "app": STYLE_APP,
+    "service": STYLE_SERVICE,
+    "api": STYLE_API,
+    "data_store": STYLE_DATA_STORE,
+    "identity": STYLE_IDENTITY,
+    "security_control": STYLE_SECURITY,
+    "vendor": STYLE_VENDOR,
+    "external": STYLE_EXTERNAL,
+}
+_FLOW_STYLE_MAP = {
+    "log": STYLE_EDGE_DASHED,
+    "telemetry": STYLE_EDGE_DASHED,
+}
+
+
 def _node_style(node_type: str) -> str:
-    m = {
-        "app": STYLE_APP,
-        "service": STYLE_SERVICE,
-        "api": STYLE_API,
-        "data_store": STYLE_DATA_STORE,
-        "identity": STYLE_IDENTITY,
-        "security_control": STYLE_SECURITY,
-        "vendor": STYLE_VENDOR,
-        "external": STYLE_EXTERNAL,
-    }
-    return m.get(node_type, STYLE_APP)
+    return _NODE_STYLE_MAP.get(node_type, STYLE_APP)
 
 
 def _flow_style(flow_type: str) -> str:
-    if flow_type in ("log", "telemetry"):
-        return STYLE_EDGE_DASHED
-    return STYLE_EDGE_SOLID
+    return _FLOW_STYLE_MAP.get(flow_type, STYLE_EDGE_SOLID)
 
 
 def _flow_label(f: dict[str, Any]) -> str:
-    if f.get("label"):
-        return str(f["label"])
-    parts = [f.get("protocol") or "", f.get("auth") or "", f.get("data_class") or ""]
-    return " | ".join(p for p in parts if p).strip() or " "
-
-
-def _ensure_list(obj: Any) -> list[Any]:
-    if isinstance(obj, list):
-        return obj
-    return [obj] if obj is not None else []
+    lbl = f.get("label")
+    if lbl:
+        return str(lbl)
+    p, a, d = f.get("protocol"), f.get("auth"), f.get("data_class")
+    return " | ".join(x for x in (p, a, d) if x) or " "
 
 
 def _next_id(prefix: str, counter: list[int]) -> str:
@@ -82,8 +92,43 @@ def _next_id(prefix: str, counter: list[int]) -> str:
     return f"{prefix}{c}"
 
 
-def _add_cell(
-    root: ET.Element,
+# Attribute escaping: escape() covers & < >; quotes must be escaped too,
+# and whitespace as character references — a literal newline in an
+# attribute value is normalized to a space by conforming parsers
+_ATTR_ESCAPES = {'"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#9;"}
+
+# Static document envelope; cells are emitted between OPEN and CLOSE
+_ENVELOPE_OPEN = (
+    '<mxfile host="app.diagrams.net" modified="2025-01-01T00:00:00.000Z">'
+    '<diagram id="security-arch" name="Security Reference Architecture">'
+    '<mxGraphModel dx="1422" dy="794" grid="1" gridSize="10" guides="1" tooltips="1"'
+    ' connect="1" arrows="1" fold="1" page="1" pageScale="1" pageWidth="1600"'
+    ' pageHeight="3200" math="0" shadow="0">'
+    '<root><mxCell id="0" /><mxCell id="1" parent="0" />'
+)
+_ENVELOPE_CLOSE = "</root></mxGraphModel></diagram></mxfile>"
+
+# Edges are uniform, so they bypass _emit_cell entirely; styles are trusted
+# module constants, only the label needs escaping at the call site
+_EDGE_TMPL = (
+    '<mxCell id="{fid}" parent="1" value="{lbl}" style="{style}" edge="1"'
+    ' source="{src}" target="{tgt}"><mxGeometry x="0" y="0" width="0" height="0"'
+    ' relative="1" as="geometry" /></mxCell>'
+)
+
+# Legend body is fixed; &#xa; entities are draw.io line breaks
+_LEGEND_TEXT = (
+    "Legend&#xa;"
+    "• Solid line: API / Auth / Data flow&#xa;"
+    "• Dashed line: Log / Telemetry&#xa;"
+    "• Red dashed: Trust boundary&#xa;"
+    "• Rounded rect: App/Service | Hexagon: API | Cylinder: Data store&#xa;"
+    "• Ellipse: Identity | Shield: Control | Dashed border: External/Vendor"
+)
+
+
+def _emit_cell(
+    parts: list[str],
     cell_id: str,
     parent_id: str,
     value: str = "",
@@ -97,39 +142,34 @@ def _add_cell(
     relative: str = "1",
     source: str | None = None,
     target: str | None = None,
-) -> ET.Element:
-    cell = ET.SubElement(root, "mxCell", id=cell_id, parent=parent_id)
+) -> None:
+    """Append an mxCell + mxGeometry as raw XML to parts (no ET node allocation)."""
+    attrs = [f'<mxCell id="{cell_id}" parent="{parent_id}"']
     if value:
-        cell.set("value", value)
+        attrs.append(f' value="{escape(value, _ATTR_ESCAPES)}"')
     if style:
-        cell.set("style", style)
+        attrs.append(f' style="{escape(style, _ATTR_ESCAPES)}"')
     if vertex:
-        cell.set("vertex", "1")
+        attrs.append(' vertex="1"')
     if edge:
-        cell.set("edge", "1")
-    geom = ET.SubElement(cell, "mxGeometry", x=f"{x}", y=f"{y}", width=f"{width}", height=f"{height}", relative=relative)
-    geom.set("as", "geometry")
+        attrs.append(' edge="1"')
     if source is not None:
-        cell.set("source", source)
+        attrs.append(f' source="{source}"')
     if target is not None:
-        cell.set("target", target)
-    return cell
-
-
-def _serialize_xml_safe(root_elem: ET.Element) -> str:
-    """Serialize to XML string with at most one declaration at position 0. No minidom."""
-    rough = ET.tostring(root_elem, encoding="unicode", default_namespace="", method="xml")
-    # ET.tostring does not add XML declaration by default
-    out = '<?xml version="1.0" encoding="UTF-8"?>\n' + rough
-    # Safety strip: if somehow multiple declarations, keep only first
-    if out.count("<?xml") > 1:
-        first = out.index("<?xml")
-        second = out.index("?>", first) + 2
-        rest = out[second:].lstrip()
-        out = out[:second] + "\n" + re.sub(r"<\?xml[^>]*\?>\s*", "", rest)
-    assert out.count("<?xml") <= 1, "output must contain at most one XML declaration"
-    if out.count("<?xml") == 1:
-        assert out.index("<?xml") == 0
+        attrs.append(f' target="{target}"')
+    attrs.append(
+        f'><mxGeometry x="{x}" y="{y}" width="{width}" height="{height}"'
+        f' relative="{relative}" as="geometry" /></mxCell>'
+    )
+    parts.extend(attrs)
+
+
+def _serialize_xml_safe(parts: list[str]) -> str:
+    """Join emitted parts under a single XML declaration at position 0."""
+    # Nothing in the emitters writes a declaration, so prefixing one is enough;
+    # the old dedup scan was dead code on the happy path. Debug-only check:
+    out = '<?xml version="1.0" encoding="UTF-8"?>\n' + "".join(parts)
+    assert out.count("<?xml") == 1 and out.index("<?xml") == 0
     assert "<mxfile" in out
     return out
 
@@ -147,88 +187,72 @@ def dsl_to_drawio(dsl: dict[str, Any]) -> str:
     if dsl is None:
         raise ValueError("DSL validation failed: " + "; ".join(val_errors))
 
-    zones = sorted(_ensure_list(dsl.get("zones", [])), key=lambda z: z.get("order", 0))
-    trust_boundaries = _ensure_list(dsl.get("trust_boundaries", []))
-    nodes = _ensure_list(dsl.get("nodes", []))
-    flows = _ensure_list(dsl.get("flows", []))
+    # List coercion inlined (hot path): single .get plus isinstance per list
+    zones = dsl.get("zones", [])
+    zones = zones if isinstance(zones, list) else ([zones] if zones is not None else [])
+    zones = sorted(zones, key=lambda z: z.get("order", 0))
+    trust_boundaries = dsl.get("trust_boundaries", [])
+    trust_boundaries = trust_boundaries if isinstance(trust_boundaries, list) else ([trust_boundaries] if trust_boundaries is not None else [])
+    nodes = dsl.get("nodes", [])
+    nodes = nodes if isinstance(nodes, list) else ([nodes] if nodes is not None else [])
+    flows = dsl.get("flows", [])
+    flows = flows if isinstance(flows, list) else ([flows] if flows is not None else [])
     node_by_id = {n["id"]: n for n in nodes}
-    nodes_in_zone: dict[str, list[dict]] = {}
+    # Pre-seed buckets from the known zone set: unconditional append per node
+    # (validation guarantees every node references an existing zone), and
+    # empty zones get their empty list upfront.
+    nodes_in_zone: dict[str, list[dict]] = {z["id"]: [] for z in zones}
     for n in nodes:
-        zid = n.get("zone") or ""
-        nodes_in_zone.setdefault(zid, []).append(n)
+        nodes_in_zone[n["zone"]].append(n)
 
     ctr = [1]
 
     def next_id(p: str) -> str:
         return _next_id(p, ctr)
 
-    # Grid layout per zone: content width = CANVAS_WIDTH, content height from required_height
-    zone_width = CANVAS_WIDTH
-    content_width = zone_width - 2 * PADDING
-    cols_max = max(1, int((content_width + GAP_X) / (NODE_W + GAP_X)))
-    zone_heights: dict[str, float] = {}
-    for z in zones:
-        zid = z["id"]
-        n_list = nodes_in_zone.get(zid, [])
-        n_count = len(n_list)
-        rows = math.ceil(n_count / cols_max) if n_count else 1
-        required_content_h = PADDING + rows * (NODE_H + GAP_Y)
-        zone_heights[zid] = ZONE_HEADER_HEIGHT + required_content_h
+    # Build XML as raw string parts: envelope is static, cells appended in order
+    parts: list[str] = [_ENVELOPE_OPEN]
 
+    # ---------- Zones (swimlane containers): single fused pass ----------
+    # Computes height, geometry and emits the swimlane cell per zone in one loop;
+    # zone_info carries (cell_id, y, h, nodes_here) positionally for the node pass,
+    # zone_bounds keys (y, h) by id for trust-boundary lookup.
     y_cursor = 0.0
-    zone_geometry: dict[str, tuple[float, float, float, float]] = {}
+    zone_info: list[tuple[str, float, float, list[dict]]] = []
+    zone_bounds: dict[str, tuple[float, float]] = {}
     for z in zones:
         zid = z["id"]
-        h = zone_heights[zid]
-        zone_geometry[zid] = (0, y_cursor, zone_width, h)
-        y_cursor += h
-
-    # Trust boundaries between zones (full width, between zones)
-    for _ in trust_boundaries:
-        y_cursor += TB_HEIGHT
-    legend_y = y_cursor + 20
-
-    # Build XML: root layer id="1"
-    root_elem = ET.Element("mxfile", host="app.diagrams.net", modified="2025-01-01T00:00:00.000Z")
-    diagram = ET.SubElement(root_elem, "diagram", id="security-arch", name="Security Reference Architecture")
-    model = ET.SubElement(diagram, "mxGraphModel", dx="1422", dy="794", grid="1", gridSize="10", guides="1", tooltips="1", connect="1", arrows="1", fold="1", page="1", pageScale="1", pageWidth="1600", pageHeight="3200", math="0", shadow="0")
-    root = ET.SubElement(model, "root")
-    ET.SubElement(root, "mxCell", id="0")
-    ET.SubElement(root, "mxCell", id="1", parent="0")
-
-    # ---------- Zones (swimlane containers) ----------
-    zone_cell_ids: dict[str, str] = {}
-    for z in zones:
-        zid = z["id"]
-        x, y, w, h = zone_geometry[zid]
+        n_list = nodes_in_zone.get(zid, [])
+        n_count = len(n_list)
+        rows = math.ceil(n_count / _COLS_MAX) if n_count else 1
+        h = ZONE_HEADER_HEIGHT + PADDING + rows * _ROW_STEP
         cell_id = next_id("zone-")
-        zone_cell_ids[zid] = cell_id
         fill = (z.get("color") or "#dae8fc").strip()
         style = f"swimlane;horizontal=1;startSize={ZONE_HEADER_HEIGHT};fillColor={fill};strokeColor=#6c8ebf;fontStyle=1;fontSize=12;whiteSpace=wrap;html=1;"
-        _add_cell(root, cell_id, "1", value=z.get("name") or zid, style=style, vertex=True, x=x, y=y, width=w, height=h, relative="0")
+        _emit_cell(parts, cell_id, "1", value=z.get("name") or zid, style=style, vertex=True, x=0, y=y_cursor, width=CANVAS_WIDTH, height=h, relative="0")
+        zone_info.append((cell_id, y_cursor, h, n_list))
+        zone_bounds[zid] = (y_cursor, h)
+        y_cursor += h
+
+    legend_y = y_cursor + TB_HEIGHT * len(trust_boundaries) + 20
 
     # ---------- Nodes (parent = zone mxCell id, geometry relative to zone) ----------
     node_cell_ids: dict[str, str] = {}
-    for z in zones:
-        zid = z["id"]
-        parent_id = zone_cell_ids[zid]
-        zx, zy, zw, zh = zone_geometry[zid]
-        zone_content_w = zw
+    for parent_id, zy, zh, n_list in zone_info:
+        zone_content_w = CANVAS_WIDTH
         zone_content_h = zh - ZONE_HEADER_HEIGHT
-        n_list = nodes_in_zone.get(zid, [])
-        cols = max(1, min(cols_max, len(n_list)) if n_list else 1)
+        cols = max(1, min(_COLS_MAX, len(n_list)) if n_list else 1)
         for i, n in enumerate(n_list):
-            col = i % cols
-            row = i // cols
-            x = PADDING + col * (NODE_W + GAP_X)
-            y = PADDING + row * (NODE_H + GAP_Y)
-            # Layout assertion: in bounds
-            assert x >= 0 and y >= 0, "node x,y must be >= 0"
-            assert x + NODE_W <= zone_content_w and y + NODE_H <= zone_content_h, "node must be inside zone"
+            x = _COL_XS[i % cols]
+            y = PADDING + (i // cols) * _ROW_STEP
+            if __debug__ and LAYOUT_DEBUG:
+                # Layout assertion: in bounds
+                assert x >= 0 and y >= 0, "node x,y must be >= 0"
+                assert x + NODE_W <= zone_content_w and y + NODE_H <= zone_content_h, "node must be inside zone"
             cell_id = next_id("node-")
             node_cell_ids[n["id"]] = cell_id
             style = _node_style(n.get("type", "app"))
-            _add_cell(root, cell_id, parent_id, value=n.get("label", n["id"]), style=style, vertex=True, x=x, y=y, width=NODE_W, height=NODE_H, relative="1")
+            _emit_cell(parts, cell_id, parent_id, value=n.get("label", n["id"]), style=style, vertex=True, x=x, y=y, width=NODE_W, height=NODE_H, relative="1")
 
     # ---------- Trust boundaries (parent to root "1", full width, dashed red) ----------
     for i, tb in enumerate(trust_boundaries):
@@ -236,15 +260,15 @@ def dsl_to_drawio(dsl: dict[str, Any]) -> str:
         if len(between) < 2:
             continue
         z0, z1 = between[0], between[1]
-        if z0 not in zone_geometry or z1 not in zone_geometry:
+        if z0 not in zone_bounds or z1 not in zone_bounds:
             continue
-        _, y0, _, h0 = zone_geometry[z0]
+        y0, h0 = zone_bounds[z0]
         y_line = y0 + h0
         label = (tb.get("label") or f"TB{i + 1}").strip()
         cell_id = next_id("tb-")
-        _add_cell(root, cell_id, "1", value=label, style=STYLE_TB, vertex=True, x=0, y=y_line, width=CANVAS_WIDTH, height=3, relative="0")
+        _emit_cell(parts, cell_id, "1", value=label, style=STYLE_TB, vertex=True, x=0, y=y_line, width=CANVAS_WIDTH, height=3, relative="0")
         lbl_id = next_id("tblbl-")
-        _add_cell(root, lbl_id, "1", value=label, style="text;html=1;strokeColor=none;fillColor=none;align=center;verticalAlign=middle;fontSize=10;fontColor=#b85450;", vertex=True, x=CANVAS_WIDTH // 2 - 40, y=y_line - 16, width=80, height=16, relative="0")
+        _emit_cell(parts, lbl_id, "1", value=label, style="text;html=1;strokeColor=none;fillColor=none;align=center;verticalAlign=middle;fontSize=10;fontColor=#b85450;", vertex=True, x=CANVAS_WIDTH // 2 - 40, y=y_line - 16, width=80, height=16, relative="0")
 
     # ---------- Flows (orthogonal, labeled; skip invalid and log) ----------
     for f in flows:
@@ -252,20 +276,16 @@ def dsl_to_drawio(dsl: dict[str, Any]) -> str:
         if src not in node_cell_ids or tgt not in node_cell_ids:
             logger.warning("Flow %s skipped: source or target node missing (source=%s, target=%s)", f.get("id"), src, tgt)
             continue
-        fid = next_id("edge-")
-        style = _flow_style(f.get("flow_type", "generic"))
-        label = _flow_label(f)
-        _add_cell(root, fid, "1", value=label, style=style, edge=True, source=node_cell_ids[src], target=node_cell_ids[tgt], x=0, y=0, width=0, height=0, relative="1")
+        parts.append(_EDGE_TMPL.format(
+            fid=next_id("edge-"),
+            lbl=escape(_flow_label(f), _ATTR_ESCAPES),
+            style=_flow_style(f.get("flow_type", "generic")),
+            src=node_cell_ids[src],
+            tgt=node_cell_ids[tgt],
+        ))
 
     # ---------- Legend (root layer) ----------
-    legend_text = (
-        "Legend&#xa;"
-        "• Solid line: API / Auth / Data flow&#xa;"
-        "• Dashed line: Log / Telemetry&#xa;"
-        "• Red dashed: Trust boundary&#xa;"
-        "• Rounded rect: App/Service | Hexagon: API | Cylinder: Data store&#xa;"
-        "• Ellipse: Identity | Shield: Control | Dashed border: External/Vendor"
-    )
-    _add_cell(root, next_id("legend-"), "1", value=legend_text, style=STYLE_LEGEND, vertex=True, x=CANVAS_WIDTH - LEGEND_WIDTH - 20, y=legend_y, width=LEGEND_WIDTH, height=LEGEND_HEIGHT, relative="0")
+    _emit_cell(parts, next_id("legend-"), "1", value=_LEGEND_TEXT, style=STYLE_LEGEND, vertex=True, x=CANVAS_WIDTH - LEGEND_WIDTH - 20, y=legend_y, width=LEGEND_WIDTH, height=LEGEND_HEIGHT, relative="0")
 
-    return _serialize_xml_safe(root_elem)
+    parts.append(_ENVELOPE_CLOSE)
+    return _serialize_xml_safe(parts)
@@ -3,12 +3,13 @@ FastAPI app: text → DSL → draw.io download.
 Single-page UI + POST /generate returns .drawio file.
 """
 
-import os
+from pathlib import Path
 from typing import Any
 
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
+from jinja2 import Environment, FileSystemLoader
 from pydantic import BaseModel, Field
 
 from app.dsl_to_drawio import dsl_to_drawio
@@ -16,6 +17,21 @@ from app.text_to_dsl import text_to_dsl
 
 app = FastAPI(title="Security Reference Architecture Diagram Generator")
 
+# Frontend template is static: build the environment and render once at import
+# instead of recompiling the template on every request
+_TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+_INDEX_HTML = Environment(loader=FileSystemLoader(str(_TEMPLATES_DIR))).get_template("index.html").render()
+
+# Sample input is static too: read once at import, serve from memory
+try:
+    _SAMPLE_TEXT = (Path(__file__).resolve().parent.parent / "examples" / "sample_input.txt").read_text(encoding="utf-8")
+except FileNotFoundError:
+    _SAMPLE_TEXT = (
+        "Generic security reference: users on the internet access an API gateway in the DMZ. "
+        "The gateway talks to identity provider for auth and to internal application services. "
+        "Applications use a database. WAF and TLS are in place."
+    )
+
 # ---------------------------------------------------------------------------
 # Request/response models
 # ---------------------------------------------------------------------------
@@ -35,13 +51,8 @@ class GenerateRequest(BaseModel):
 
 @app.get("/", response_class=HTMLResponse)
 async def index():
-    """Serve the single-page frontend."""
-    from pathlib import Path
-    from jinja2 import Environment, FileSystemLoader
-    templates_dir = Path(__file__).resolve().parent / "templates"
-    env = Environment(loader=FileSystemLoader(str(templates_dir)))
-    template = env.get_template("index.html")
-    return template.render()
+    """Serve the single-page frontend (pre-rendered at startup)."""
+    return _INDEX_HTML
 
 
 @app.post("/api/generate")
@@ -68,8 +79,9 @@ async def generate(req: GenerateRequest) -> Response:
     except Exception as e:
         raise HTTPException(status_code=500, detail={"errors": [str(e)]})
     filename = "security_architecture.drawio"
+    # Encode once here so the response layer streams bytes directly
     return Response(
-        content=xml,
+        content=xml.encode("utf-8"),
         media_type="application/xml",
         headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
@@ -78,17 +90,7 @@ async def generate(req: GenerateRequest) -> Response:
 @app.get("/api/sample")
 async def sample_input() -> dict[str, Any]:
     """Return sample input text for the frontend (load sample button)."""
-    sample_path = os.path.join(os.path.dirname(__file__), "..", "examples", "sample_input.txt")
-    try:
-        with open(sample_path, "r", encoding="utf-8") as f:
-            text = f.read()
-    except FileNotFoundError:
-        text = (
-            "Generic security reference: users on the internet access an API gateway in the DMZ. "
-            "The gateway talks to identity provider for auth and to internal application services. "
-            "Applications use a database. WAF and TLS are in place."
-        )
-    return {"text": text}
+    return {"text": _SAMPLE_TEXT}
 
 
 @app.get("/api/health")
@@ -6,9 +6,12 @@ Text → DSL: Converts natural language (or structured text) into Architecture D
 
 from __future__ import annotations
 
+import concurrent.futures
+import functools
 import json
 import os
 import re
+import time
 from typing import Any
 
 from app.dsl import (
@@ -19,13 +22,222 @@ from app.dsl import (
     Node,
     TrustBoundary,
     Zone,
-    get_json_schema,
+    get_json_schema_bytes,
     validate_dsl,
 )
 
+# Fast JSON for the hot parse/serialize paths (LLM output, repair loop).
+# orjson is optional; stdlib json with compact separators otherwise. Its
+# JSONDecodeError subclasses json.JSONDecodeError, so except clauses are shared.
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj, separators=(",", ":"))
+
 # Maximum repair attempts when using LLM
 MAX_REPAIR_ATTEMPTS = 2
 
+# Client-side response cache for DSL generation: identical (text, profile,
+# detail_level) within the TTL reuses the last LLM answer instead of paying
+# another round-trip (common when the frontend re-submits unchanged input).
+# Only answers that parsed and validated are stored — a bad completion is
+# never negatively cached and retries the API on the next request
+_LLM_CACHE_TTL = 600.0  # seconds
+_LLM_CACHE_MAX = 128
+_llm_response_cache: dict[tuple[str, str, str], tuple[float, str]] = {}
+
+# Tokenizer for stub keyword matching (hyphen kept so "on-prem" survives)
+_TOKEN_RE = re.compile(r"[a-z0-9\-]+")
+
+# Runs the speculative stub generation while the LLM call blocks on I/O
+_STUB_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+
+# Zone inference table: (keyword, display name, lowered name, color).
+# The lowered name is precomputed so the match loop never calls .lower()
+_ZONE_KEYWORDS: tuple[tuple[str, str, str, str], ...] = (
+    ("internet", "Internet", "internet", "#fff2cc"),
+    ("dmz", "DMZ", "dmz", "#ffe6cc"),
+    ("cloud", "Cloud", "cloud", "#dae8fc"),
+    ("tenant", "Tenant", "tenant", "#e1d5e7"),
+    ("on-prem", "On-Premises", "on-premises", "#d5e8d4"),
+    ("internal", "Internal", "internal", "#d5e8d4"),
+    ("data", "Data Layer", "data layer", "#f8cecc"),
+    ("identity", "Identity", "identity", "#e1d5e7"),
+    ("vendor", "Vendor / External", "vendor / external", "#f5f5f5"),
+)
+
+# Fallback zones when no keywords match (copied per call; preparation
+# mutates zone dicts in place)
+_DEFAULT_ZONES: tuple[dict[str, Any], ...] = (
+    {"id": "z0", "name": "External", "order": 0, "color": "#fff2cc"},
+    {"id": "z1", "name": "Perimeter", "order": 1, "color": "#ffe6cc"},
+    {"id": "z2", "name": "Internal", "order": 2, "color": "#d5e8d4"},
+)
+
+# Stub node inference rules: (keywords, label, node type, zone index).
+# Zone index picks from the inferred zone list, clamped to its length;
+# -1 means the innermost (last) zone.
+_NODE_RULES: tuple[tuple[tuple[str, ...], str, str, int], ...] = (
+    (("api", "gateway"), "API Gateway", "api", 1),
+    (("waf", "firewall"), "WAF / Firewall", "security_control", 0),
+    (("app", "application", "service"), "Application Service", "service", -1),
+    (("database", "db", "store"), "Database", "data_store", -1),
+    (("identity", "idp", "oauth"), "Identity Provider", "identity", 1),
+    (("user", "client"), "User / Client", "external", 0),
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _cached_schema_json() -> str:
+    """
+    DSL schema for LLM prompts; invariant, serialized once via the shared
+    cached bytes in app.dsl. Compact form: indentation only inflates prompt
+    tokens (~40%), the model parses either.
+    """
+    return get_json_schema_bytes().decode("utf-8")
+
+
+@functools.lru_cache(maxsize=1)
+def _dsl_system_prompt() -> str:
+    """
+    Static instruction + schema prefix for DSL generation. Kept free of
+    per-call variables and byte-identical across requests so provider-side
+    prompt caching covers the whole (large) prefix.
+    """
+    return f"""You are a security architect. Convert the architecture description in the user message into a strict JSON object that matches this schema.
+
+Schema (follow exactly):
+{_cached_schema_json()}
+
+Requirements:
+- Use only the fields defined in the schema. No extra fields.
+- zones: list of {{"id": string, "name": string, "order": number (0=top), "color": hex or name}}
+- trust_boundaries: list of {{"id": string, "label": string, "between_zones": [zone_id, zone_id]}}
+- groups: list of {{"id": string, "label": string, "zone": zone_id, "children": [node_id or group_id]}}
+- nodes: list of {{"id": string, "label": string, "zone": zone_id, "type": "app"|"service"|"api"|"data_store"|"identity"|"security_control"|"vendor"|"external", "tags": []}}
+- flows: list of {{"id": string, "source": node_id, "target": node_id, "flow_type": "api"|"auth"|"data"|"log"|"telemetry"|"generic", "protocol": string, "auth": string, "data_class": string, "label": null or string}}
+- controls: list of {{"id": string, "scope": [id, ...], "control_type": string}}
+
+Respond with ONLY the JSON object, no markdown code fence or explanation."""
+
+
+_TOP_LEVEL_LIST_KEYS = ("zones", "trust_boundaries", "groups", "nodes", "flows", "controls")
+_VALID_NODE_TYPES = {"app", "service", "api", "data_store", "identity", "security_control", "vendor", "external"}
+
+
+def _local_repair(dsl_dict: dict[str, Any]) -> dict[str, Any]:
+    """
+    Cheap structural fixes applied before burning an LLM repair round-trip:
+    fill in missing/null top-level lists, coerce stringified zone order to
+    int, and map unknown node types to "service". Mutates and returns dsl_dict.
+    """
+    for key in _TOP_LEVEL_LIST_KEYS:
+        if dsl_dict.get(key) is None:
+            dsl_dict[key] = []
+    # Non-list values (e.g. {"zones": 5}) are left for validate_dsl to
+    # report; only iterate what is actually a list
+    if isinstance(dsl_dict["zones"], list):
+        for z in dsl_dict["zones"]:
+            if isinstance(z, dict):
+                order = z.get("order")
+                if isinstance(order, str) and order.lstrip("-").isdigit():
+                    z["order"] = int(order)
+    if isinstance(dsl_dict["nodes"], list):
+        for n in dsl_dict["nodes"]:
+            if isinstance(n, dict) and "type" in n and n["type"] not in _VALID_NODE_TYPES:
+                n["type"] = "service"
+    return dsl_dict
+
+
+# Lazy singleton; only a successfully constructed client is kept, so a key
+# set after startup is picked up on the next call (matching try_llm, which
+# re-reads the env every time)
+_openai_client = None
+
+
+def _get_openai_client():
+    """
+    Lazy singleton OpenAI client so repeated calls (and the repair loop)
+    reuse one httpx connection pool instead of re-doing TLS setup.
+    Returns None when openai is not installed or no API key is configured.
+    """
+    global _openai_client
+    if _openai_client is not None:
+        return _openai_client
+    try:
+        from openai import OpenAI
+    except ImportError:
+        return None
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key or not api_key.strip():
+        return None
+    _openai_client = OpenAI(api_key=api_key)
+    return _openai_client
+
+
+def _strip_code_fence(content: str) -> str:
+    """Strip a surrounding markdown code fence using plain string ops (no regex)."""
+    nl = content.find("\n")
+    content = content[nl + 1:] if nl != -1 else content[3:]
+    if content.endswith("```"):
+        content = content[:-3].rstrip()
+    return content
+
+
+def _collect_streamed_json(stream) -> str:
+    """
+    Accumulate a streamed chat completion and stop as soon as the JSON
+    payload is structurally complete (bracket depth back to zero outside
+    strings). Saves the tail of the stream — trailing fence, whitespace,
+    stop-token latency — without waiting for the final chunk. Falls back
+    to consuming the whole stream if no JSON start is ever seen.
+    """
+    parts: list[str] = []
+    depth = 0
+    started = False
+    in_str = False
+    escaped = False
+    for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if not delta:
+            continue
+        parts.append(delta)
+        for ch in delta:
+            if escaped:
+                escaped = False
+            elif in_str:
+                if ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_str = False
+            elif ch == '"':
+                in_str = True
+            elif ch == "{" or ch == "[":
+                depth += 1
+                started = True
+            elif ch == "}" or ch == "]":
+                depth -= 1
+        if started and depth <= 0:
+            break
+    try:
+        stream.close()
+    except Exception:
+        pass
+    return "".join(parts)
+
+
+def _node(nid: str, label: str, zone: str, type_: str) -> dict[str, Any]:
+    """Stub node shape: one construction site shared by every append."""
+    return {"id": nid, "label": label, "zone": zone, "type": type_, "tags": []}
+
 
 def _stub_dsl_from_text(text: str) -> dict[str, Any]:
     """
@@ -33,6 +245,10 @@ def _stub_dsl_from_text(text: str) -> dict[str, Any]:
     No proprietary names; generic zones and components.
     """
     t = (text or "").lower()
+    # Tokenize once: exact-token hits become O(1) set lookups. The substring
+    # scan stays as the fallback so inflected forms ("users", "databases")
+    # keep matching their keyword stems like they always have
+    tokens = set(_TOKEN_RE.findall(t))
     zones_list: list[dict[str, Any]] = []
     nodes_list: list[dict[str, Any]] = []
     flows_list: list[dict[str, Any]] = []
@@ -40,30 +256,18 @@ def _stub_dsl_from_text(text: str) -> dict[str, Any]:
     trust_boundaries_list: list[dict[str, Any]] = []
     controls_list: list[dict[str, Any]] = []
 
-    # Infer zones from keywords
-    zone_keywords = [
-        ("internet", "Internet", "#fff2cc"),
-        ("dmz", "DMZ", "#ffe6cc"),
-        ("cloud", "Cloud", "#dae8fc"),
-        ("tenant", "Tenant", "#e1d5e7"),
-        ("on-prem", "On-Premises", "#d5e8d4"),
-        ("internal", "Internal", "#d5e8d4"),
-        ("data", "Data Layer", "#f8cecc"),
-        ("identity", "Identity", "#e1d5e7"),
-        ("vendor", "Vendor / External", "#f5f5f5"),
-    ]
-    for i, (kw, name, color) in enumerate(zone_keywords):
-        if kw in t or name.lower() in t:
-            zones_list.append({"id": f"z{i}", "name": name, "order": i, "color": color})
+    # Infer zones from keywords; ids are tracked in parallel as we append
+    zone_ids: list[str] = []
+    for i, (kw, name, lname, color) in enumerate(_ZONE_KEYWORDS):
+        if kw in tokens or kw in t or lname in t:
+            zid = f"z{i}"
+            zone_ids.append(zid)
+            zones_list.append({"id": zid, "name": name, "order": i, "color": color})
 
     if not zones_list:
-        zones_list = [
-            {"id": "z0", "name": "External", "order": 0, "color": "#fff2cc"},
-            {"id": "z1", "name": "Perimeter", "order": 1, "color": "#ffe6cc"},
-            {"id": "z2", "name": "Internal", "order": 2, "color": "#d5e8d4"},
-        ]
+        zones_list = [dict(z) for z in _DEFAULT_ZONES]
+        zone_ids = ["z0", "z1", "z2"]
 
-    zone_ids = [z["id"] for z in zones_list]
     # Trust boundaries between consecutive zones
     for i in range(len(zone_ids) - 1):
         trust_boundaries_list.append({
@@ -72,55 +276,25 @@ def _stub_dsl_from_text(text: str) -> dict[str, Any]:
             "between_zones": [zone_ids[i], zone_ids[i + 1]],
         })
 
-    # Nodes: infer from keywords
-    node_id = 0
-    if "api" in t or "gateway" in t:
-        nodes_list.append({
-            "id": f"n{node_id}", "label": "API Gateway", "zone": zone_ids[min(1, len(zone_ids) - 1)],
-            "type": "api", "tags": [],
-        })
-        node_id += 1
-    if "waf" in t or "firewall" in t:
-        nodes_list.append({
-            "id": f"n{node_id}", "label": "WAF / Firewall", "zone": zone_ids[0] if zone_ids else "z0",
-            "type": "security_control", "tags": [],
-        })
-        node_id += 1
-    if "app" in t or "application" in t or "service" in t:
-        nodes_list.append({
-            "id": f"n{node_id}", "label": "Application Service", "zone": zone_ids[-1] if zone_ids else "z2",
-            "type": "service", "tags": [],
-        })
-        node_id += 1
-    if "database" in t or "db" in t or "store" in t:
-        nodes_list.append({
-            "id": f"n{node_id}", "label": "Database", "zone": zone_ids[-1] if zone_ids else "z2",
-            "type": "data_store", "tags": [],
-        })
-        node_id += 1
-    if "identity" in t or "idp" in t or "oauth" in t:
-        nodes_list.append({
-            "id": f"n{node_id}", "label": "Identity Provider", "zone": zone_ids[min(1, len(zone_ids) - 1)] if zone_ids else "z1",
-            "type": "identity", "tags": [],
-        })
-        node_id += 1
-    if "user" in t or "client" in t:
-        nodes_list.append({
-            "id": f"n{node_id}", "label": "User / Client", "zone": zone_ids[0] if zone_ids else "z0",
-            "type": "external", "tags": [],
-        })
-        node_id += 1
+    # Nodes: infer from keywords (data-driven, one pass over _NODE_RULES)
+    node_ids: list[str] = []
+    last = len(zone_ids) - 1
+    for kws, label, type_, z_idx in _NODE_RULES:
+        if any(k in tokens or k in t for k in kws):
+            nid = f"n{len(node_ids)}"
+            node_ids.append(nid)
+            zone = zone_ids[z_idx] if z_idx < 0 else zone_ids[min(z_idx, last)]
+            nodes_list.append(_node(nid, label, zone, type_))
 
     if not nodes_list:
         nodes_list = [
-            {"id": "n0", "label": "Client", "zone": zone_ids[0], "type": "external", "tags": []},
-            {"id": "n1", "label": "Web App", "zone": zone_ids[-1], "type": "service", "tags": []},
-            {"id": "n2", "label": "Database", "zone": zone_ids[-1], "type": "data_store", "tags": []},
+            _node("n0", "Client", zone_ids[0], "external"),
+            _node("n1", "Web App", zone_ids[-1], "service"),
+            _node("n2", "Database", zone_ids[-1], "data_store"),
         ]
-        node_id = 3
+        node_ids = ["n0", "n1", "n2"]
 
     # Flows: connect first few nodes
-    node_ids = [n["id"] for n in nodes_list]
     if len(node_ids) >= 2:
         flows_list.append({
             "id": "f0", "source": node_ids[0], "target": node_ids[1],
@@ -133,7 +307,7 @@ def _stub_dsl_from_text(text: str) -> dict[str, Any]:
         })
 
     # Optional controls
-    if "encrypt" in t or "tls" in t:
+    if "tls" in tokens or "encrypt" in t or "tls" in t:
         controls_list.append({
             "id": "c0", "scope": node_ids[:2] if node_ids else [], "control_type": "Encryption (TLS)",
         })
@@ -149,88 +323,129 @@ def _stub_dsl_from_text(text: str) -> dict[str, Any]:
     }
 
 
-def _call_llm_for_dsl(text: str, profile: str, detail_level: str, schema: dict[str, Any]) -> str | None:
-    """Call OpenAI to produce DSL JSON. Returns JSON string or None on failure."""
-    try:
-        from openai import OpenAI
-    except ImportError:
-        return None
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key or not api_key.strip():
-        return None
-    client = OpenAI(api_key=api_key)
-    prompt = f"""You are a security architect. Convert the following architecture description into a strict JSON object that matches this schema.
-
-Schema (follow exactly):
-{json.dumps(schema, indent=2)}
-
-Requirements:
-- Use only the fields defined in the schema. No extra fields.
-- zones: list of {{"id": string, "name": string, "order": number (0=top), "color": hex or name}}
-- trust_boundaries: list of {{"id": string, "label": string, "between_zones": [zone_id, zone_id]}}
-- groups: list of {{"id": string, "label": string, "zone": zone_id, "children": [node_id or group_id]}}
-- nodes: list of {{"id": string, "label": string, "zone": zone_id, "type": "app"|"service"|"api"|"data_store"|"identity"|"security_control"|"vendor"|"external", "tags": []}}
-- flows: list of {{"id": string, "source": node_id, "target": node_id, "flow_type": "api"|"auth"|"data"|"log"|"telemetry"|"generic", "protocol": string, "auth": string, "data_class": string, "label": null or string}}
-- controls: list of {{"id": string, "scope": [id, ...], "control_type": string}}
-
-Profile: {profile}. Detail level: {detail_level}.
+@functools.lru_cache(maxsize=256)
+def _build_dsl_user_prompt(text: str, profile: str, detail_level: str) -> str:
+    """Assemble the per-call user prompt; memoized for repeated inputs."""
+    return f"""Profile: {profile}. Detail level: {detail_level}.
 
 Architecture description:
 ---
-{text[:8000]}
----
+{text}
+---"""
 
-Respond with ONLY the JSON object, no markdown code fence or explanation."""
+
+def _call_llm_for_dsl(text: str, profile: str, detail_level: str) -> str | None:
+    """Call OpenAI to produce DSL JSON. Returns JSON string or None on failure."""
+    client = _get_openai_client()
+    if client is None:
+        return None
+    # Dynamic suffix only; everything static lives in the system prompt
+    user_prompt = _build_dsl_user_prompt(text[:8000], profile, detail_level)
 
     try:
-        resp = client.chat.completions.create(
+        stream = client.chat.completions.create(
             model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
+            messages=[
+                {"role": "system", "content": _dsl_system_prompt()},
+                {"role": "user", "content": user_prompt},
+            ],
             temperature=0.2,
+            stream=True,
         )
-        content = (resp.choices[0].message.content or "").strip()
+        content = _collect_streamed_json(stream).strip()
         # Strip markdown code block if present
         if content.startswith("```"):
-            content = re.sub(r"^```\w*\n?", "", content)
-            content = re.sub(r"\n?```\s*$", "", content)
+            content = _strip_code_fence(content)
         return content
     except Exception:
         return None
 
 
-def _repair_dsl_with_llm(current_json: str, validation_errors: list[str], schema: dict[str, Any]) -> str | None:
-    """Ask LLM to fix the JSON given validation errors. Returns repaired JSON string or None."""
-    try:
-        from openai import OpenAI
-    except ImportError:
+def _cached_llm_response(key: tuple[str, str, str]) -> str | None:
+    """Return the cached LLM answer for key if present and within the TTL."""
+    cached = _llm_response_cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < _LLM_CACHE_TTL:
+        return cached[1]
+    return None
+
+
+def _cache_llm_response(key: tuple[str, str, str], content: str) -> None:
+    """Store an LLM answer; evict expired entries, then oldest, at the cap."""
+    now = time.monotonic()
+    if len(_llm_response_cache) >= _LLM_CACHE_MAX:
+        for k in [k for k, (ts, _) in _llm_response_cache.items() if now - ts >= _LLM_CACHE_TTL]:
+            del _llm_response_cache[k]
+        if len(_llm_response_cache) >= _LLM_CACHE_MAX:
+            del _llm_response_cache[min(_llm_response_cache, key=lambda k: _llm_response_cache[k][0])]
+    _llm_response_cache[key] = (now, content)
+
+
+def _call_llm_for_dsl_batch(texts: list[str], profile: str, detail_level: str) -> str | None:
+    """Call OpenAI for several descriptions at once. Returns JSON-array string or None."""
+    client = _get_openai_client()
+    if client is None:
         return None
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key or not api_key.strip():
+    numbered = "\n\n".join(f"--- Description {i + 1} ---\n{t[:8000]}" for i, t in enumerate(texts))
+    user_prompt = f"""Profile: {profile}. Detail level: {detail_level}.
+
+Produce a JSON array of length {len(texts)}: entry i is the DSL object for description i.
+Respond with ONLY the JSON array, no markdown code fence or explanation.
+
+{numbered}"""
+
+    try:
+        stream = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": _dsl_system_prompt()},
+                {"role": "user", "content": user_prompt},
+            ],
+            temperature=0.2,
+            stream=True,
+        )
+        content = _collect_streamed_json(stream).strip()
+        if content.startswith("```"):
+            content = _strip_code_fence(content)
+        return content
+    except Exception:
         return None
-    client = OpenAI(api_key=api_key)
-    prompt = f"""The following JSON is invalid for our architecture schema. Fix it so it validates.
 
-Validation errors:
-{chr(10).join(validation_errors)}
 
-Current JSON:
-{current_json}
+@functools.lru_cache(maxsize=1)
+def _repair_system_prompt() -> str:
+    """Static repair instructions + schema; stable prefix like _dsl_system_prompt."""
+    return f"""The user message contains JSON that is invalid for our architecture schema, along with the validation errors. Fix the JSON so it validates.
 
 Schema (for reference):
-{json.dumps(schema, indent=2)}
+{_cached_schema_json()}
 
 Respond with ONLY the corrected JSON object, no markdown or explanation."""
 
+
+def _repair_dsl_with_llm(current_json: str, validation_errors: list[str]) -> str | None:
+    """Ask LLM to fix the JSON given validation errors. Returns repaired JSON string or None."""
+    client = _get_openai_client()
+    if client is None:
+        return None
+    user_prompt = f"""Validation errors:
+{chr(10).join(validation_errors)}
+
+Current JSON:
+{current_json}"""
+
     try:
-        resp = client.chat.completions.create(
+        stream = client.chat.completions.create(
             model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
+            messages=[
+                {"role": "system", "content": _repair_system_prompt()},
+                {"role": "user", "content": user_prompt},
+            ],
             temperature=0.1,
+            stream=True,
         )
-        content = (resp.choices[0].message.content or "").strip()
+        content = _collect_streamed_json(stream).strip()
         if content.startswith("```"):
-            content = re.sub(r"^```\w*\n?", "", content)
-            content = re.sub(r"\n?```\s*$", "", content)
+            content = _strip_code_fence(content)
         return content
     except Exception:
         return None
@@ -251,17 +466,31 @@ def text_to_dsl(
     Returns (dsl_dict, errors). If errors non-empty, dsl_dict may still be the stub (when LLM failed).
     """
     errors: list[str] = []
-    schema = get_json_schema()
     dsl_dict: dict[str, Any] | None = None
     raw_json_str: str | None = None
 
     try_llm = use_llm if use_llm is not None else bool(os.environ.get("OPENAI_API_KEY"))
 
+    stub_future: concurrent.futures.Future | None = None
+    cache_key: tuple[str, str, str] | None = None
+    from_cache = False
     if try_llm:
-        raw_json_str = _call_llm_for_dsl(text, profile, detail_level, schema)
+        # Response cache first: an identical request inside the TTL reuses
+        # the last answer that parsed and validated (a fresh parse each
+        # time, so callers never alias cached state)
+        cache_key = (text[:8000], profile, detail_level)
+        cached = _cached_llm_response(cache_key)
+        if cached is not None:
+            raw_json_str = cached
+            from_cache = True
+        else:
+            # Speculate: the stub is the fallback on any LLM failure and costs
+            # <1ms of worker time, so run it while the LLM call blocks on I/O
+            stub_future = _STUB_EXECUTOR.submit(_stub_dsl_from_text, text)
+            raw_json_str = _call_llm_for_dsl(text, profile, detail_level)
         if raw_json_str:
             try:
-                dsl_dict = json.loads(raw_json_str)
+                dsl_dict = _json_loads(raw_json_str)
             except json.JSONDecodeError as e:
                 errors.append(f"LLM returned invalid JSON: {e}")
                 dsl_dict = None
@@ -269,21 +498,42 @@ def text_to_dsl(
     if dsl_dict is None and not try_llm:
         dsl_dict = _stub_dsl_from_text(text)
     elif dsl_dict is None and try_llm:
-        dsl_dict = _stub_dsl_from_text(text)
+        dsl_dict = stub_future.result() if stub_future is not None else _stub_dsl_from_text(text)
         errors.append("LLM unavailable or returned invalid response; used stub generator.")
+    elif stub_future is not None:
+        stub_future.cancel()  # LLM succeeded; discard the speculative stub
 
     if dsl_dict is None:
         return (None, errors or ["Failed to produce DSL."])
 
     # Validation and optional repair loop
     model, validation_errors = validate_dsl(dsl_dict)
+    if model is not None:
+        # Valid as-is (stub output or LLM JSON that passed first try): the
+        # dict is already in target form, so skip the model_dump round-trip
+        # that re-serializes every field
+        if raw_json_str and cache_key is not None and not from_cache and not errors:
+            # Cache only an LLM answer that parsed and validated; a bad
+            # completion must retry the API on the next request
+            _cache_llm_response(cache_key, raw_json_str)
+        return (dsl_dict, [])
+    if model is None and validation_errors and isinstance(dsl_dict, dict):
+        # Cheap local fixes first; only go back to the LLM if still failing
+        dsl_dict = _local_repair(dsl_dict)
+        model, validation_errors = validate_dsl(dsl_dict)
     attempt = 0
+    prev_errors: list[str] = []
     while model is None and validation_errors and try_llm and attempt < MAX_REPAIR_ATTEMPTS:
-        raw_json_str = json.dumps(dsl_dict, indent=2)
-        repaired = _repair_dsl_with_llm(raw_json_str, validation_errors, schema)
+        if validation_errors == prev_errors:
+            break  # Stagnated: another round-trip would see the same errors
+        prev_errors = validation_errors
+        raw_json_str = _json_dumps(dsl_dict)
+        repaired = _repair_dsl_with_llm(raw_json_str, validation_errors)
         if repaired:
             try:
-                dsl_dict = json.loads(repaired)
+                dsl_dict = _json_loads(repaired)
+                if isinstance(dsl_dict, dict):
+                    dsl_dict = _local_repair(dsl_dict)
                 model, validation_errors = validate_dsl(dsl_dict)
             except json.JSONDecodeError:
                 validation_errors = ["Repair produced invalid JSON"]
@@ -293,3 +543,49 @@ def text_to_dsl(
         return (dsl_dict, validation_errors)  # Return stub or last attempt with errors
 
     return (model.model_dump(mode="json"), [])
+
+
+def text_to_dsl_batch(
+    texts: list[str],
+    profile: str = "Generic Security Reference",
+    detail_level: str = "standard",
+    use_llm: bool | None = None,
+) -> list[tuple[dict[str, Any] | None, list[str]]]:
+    """
+    Convert several descriptions with one LLM round-trip instead of N.
+    Amortizes per-request overhead (headers, TTFT, rate-limit credits) across
+    the batch. On malformed batch output the batch is split in half and
+    retried; entries that still fail fall back to the single-text path.
+    Without the LLM, each text just goes through the stub generator.
+    """
+    if not texts:
+        return []
+    try_llm = use_llm if use_llm is not None else bool(os.environ.get("OPENAI_API_KEY"))
+    if not try_llm or len(texts) == 1:
+        return [text_to_dsl(t, profile, detail_level, use_llm) for t in texts]
+
+    raw = _call_llm_for_dsl_batch(texts, profile, detail_level)
+    parsed: Any = None
+    if raw:
+        try:
+            parsed = _json_loads(raw)
+        except json.JSONDecodeError:
+            parsed = None
+    if not isinstance(parsed, list) or len(parsed) != len(texts):
+        # Malformed batch: binary split (terminates at single-text batches)
+        mid = len(texts) // 2
+        return (
+            text_to_dsl_batch(texts[:mid], profile, detail_level, use_llm)
+            + text_to_dsl_batch(texts[mid:], profile, detail_level, use_llm)
+        )
+
+    results: list[tuple[dict[str, Any] | None, list[str]]] = []
+    for text, entry in zip(texts, parsed):
+        if isinstance(entry, dict):
+            model, _ = validate_dsl(entry)
+            if model is not None:
+                results.append((entry, []))
+                continue
+        # Invalid entry: single-text path gets the repair loop and stub fallback
+        results.append(text_to_dsl(text, profile, detail_level, use_llm))
+    return results
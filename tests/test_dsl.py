@@ -12,7 +12,9 @@ from app.dsl import (
     Flow,
     Control,
     validate_dsl,
+    validate_dsl_trusted,
     get_json_schema,
+    get_json_schema_bytes,
 )
 
 
@@ -84,9 +86,36 @@ def test_validate_dsl_flow_source_target():
     assert model.flows[0].source == "n0" and model.flows[0].target == "n1"
 
 
+def test_validate_dsl_trusted_skips_validation():
+    data = {
+        "zones": [{"id": "z0", "name": "External", "order": 0, "color": "#fff"}],
+        "nodes": [
+            {"id": "n0", "label": "Client", "zone": "z0", "type": "external", "tags": []}
+        ],
+        "flows": [
+            {"id": "f0", "source": "n0", "target": "n0", "flow_type": "api", "protocol": "HTTPS"}
+        ],
+    }
+    model = validate_dsl_trusted(data)
+    assert isinstance(model, ArchitectureDSL)
+    assert model.zones[0].id == "z0"
+    assert model.nodes[0].label == "Client"
+    assert model.flows[0].protocol == "HTTPS"
+
+
 def test_get_json_schema():
     schema = get_json_schema()
     assert "properties" in schema
     assert "zones" in schema["properties"]
     assert "nodes" in schema["properties"]
     assert "flows" in schema["properties"]
+
+
+def test_get_json_schema_bytes():
+    import json
+
+    raw = get_json_schema_bytes()
+    assert isinstance(raw, bytes)
+    assert json.loads(raw) == get_json_schema()
+    # Cached: same object on repeat calls
+    assert get_json_schema_bytes() is raw
@@ -0,0 +1,121 @@
+"""
+Unit tests for text → DSL conversion: streamed-JSON collection and batching.
+"""
+
+from types import SimpleNamespace
+
+import app.text_to_dsl as text_to_dsl_module
+from app.text_to_dsl import _collect_streamed_json, text_to_dsl_batch
+
+
+class FakeStream:
+    """Iterable of chat-completion chunks; records consumption and close()."""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        for content in self._chunks:
+            self.consumed += 1
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+    def close(self):
+        self.closed = True
+
+
+def test_collect_streamed_json_stops_at_payload_end():
+    stream = FakeStream(['{"a": 1, ', '"b": [2, 3]}', " trailing never read"])
+    out = _collect_streamed_json(stream)
+    assert out == '{"a": 1, "b": [2, 3]}'
+    assert stream.consumed == 2
+    assert stream.closed
+
+
+def test_collect_streamed_json_ignores_braces_inside_strings():
+    stream = FakeStream(['{"a": "x} ] {", ', '"b": 1}', "tail"])
+    out = _collect_streamed_json(stream)
+    assert out == '{"a": "x} ] {", "b": 1}'
+    assert stream.consumed == 2
+
+
+def test_collect_streamed_json_handles_escaped_quotes():
+    stream = FakeStream(['{"a": "q\\"}', '"}', "tail"])
+    out = _collect_streamed_json(stream)
+    assert out == '{"a": "q\\"}"}'
+    assert stream.consumed == 2
+
+
+def test_collect_streamed_json_fenced_output():
+    # Leading fence has no brackets, so depth tracking starts at the payload;
+    # the trailing fence in the same chunk is kept (stripped by the caller)
+    stream = FakeStream(["```json\n", '{"a": 1}\n```'])
+    out = _collect_streamed_json(stream)
+    assert out.startswith("```json")
+    assert '{"a": 1}' in out
+    assert stream.consumed == 2
+
+
+def test_collect_streamed_json_no_json_drains_stream():
+    stream = FakeStream(["no ", "json ", "here"])
+    out = _collect_streamed_json(stream)
+    assert out == "no json here"
+    assert stream.consumed == 3
+
+
+def _valid_dsl(label):
+    return {
+        "zones": [{"id": "z0", "name": "Z", "order": 0, "color": "#fff"}],
+        "trust_boundaries": [],
+        "groups": [],
+        "nodes": [{"id": "n0", "label": label, "zone": "z0", "type": "service", "tags": []}],
+        "flows": [],
+        "controls": [],
+    }
+
+
+def test_text_to_dsl_batch_empty_and_stub():
+    assert text_to_dsl_batch([]) == []
+    results = text_to_dsl_batch(["internet api gateway", "database"], use_llm=False)
+    assert len(results) == 2
+    for dsl, errors in results:
+        assert dsl is not None
+        assert errors == []
+
+
+def test_text_to_dsl_batch_valid_llm_array(monkeypatch):
+    import json
+
+    texts = ["first", "second"]
+
+    def fake_batch(batch_texts, profile, detail_level):
+        return json.dumps([_valid_dsl(t) for t in batch_texts])
+
+    monkeypatch.setattr(text_to_dsl_module, "_call_llm_for_dsl_batch", fake_batch)
+    # Hermetic even with openai installed and a key in the environment
+    monkeypatch.setattr(text_to_dsl_module, "_get_openai_client", lambda: None)
+    results = text_to_dsl_batch(texts, use_llm=True)
+    assert len(results) == 2
+    assert [r[0]["nodes"][0]["label"] for r in results] == texts
+    assert all(r[1] == [] for r in results)
+
+
+def test_text_to_dsl_batch_malformed_splits_and_falls_back(monkeypatch):
+    calls = []
+
+    def fake_batch(batch_texts, profile, detail_level):
+        calls.append(list(batch_texts))
+        return "not json"
+
+    monkeypatch.setattr(text_to_dsl_module, "_call_llm_for_dsl_batch", fake_batch)
+    # The single-text fallback goes through text_to_dsl(use_llm=True); stub
+    # out the client so no live API call is made when a key is configured
+    monkeypatch.setattr(text_to_dsl_module, "_get_openai_client", lambda: None)
+    results = text_to_dsl_batch(["a", "b", "c", "d"], use_llm=True)
+    # Binary split: full batch, then both halves
+    assert calls == [["a", "b", "c", "d"], ["a", "b"], ["c", "d"]]
+    # Single-text batches take the text_to_dsl path, which falls back to the
+    # stub (no LLM client configured here)
+    assert len(results) == 4
+    assert all(dsl is not None for dsl, _ in results)